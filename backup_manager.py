@@ -1,160 +1,523 @@
 # backup_manager.py
 
 import logging
-from file_scanner import calculate_file_hash
-from database_manager import DatabaseManager
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, repeat
+from file_scanner import calculate_file_hash, hash_and_copy, hash_batch, scan_entries, MMAP_THRESHOLD, SMALL_FILE_SIZE
 from colorama import Fore, Style
+from tqdm import tqdm
 import shutil
 import config
+import errno
 import os
 
+logger = logging.getLogger(__name__)
+
+HASH_BATCH_SIZE = 64  # Small files hashed per worker task
+# Algorithms whose C implementation releases the GIL while hashing, so worker threads hash in parallel
+GIL_RELEASING_ALGORITHMS = {'sha1', 'sha256', 'sha512', 'md5', 'blake2b', 'blake3'}
+ZERO_COPY_CHUNK = 1 << 30
+# Errors meaning the zero-copy syscall is unsupported here (cross-device, old kernel, non-Linux, ...)
+ZERO_COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTSOCK}
+
+
+def hash_only_worker(file_path, algorithm):
+    """
+    Hash a file in a worker thread or process. Never touches the database.
+
+    :param file_path: Full path to the file to hash.
+    :param algorithm: Name of the hash algorithm.
+    :return: Tuple of (file path, hash, error); the hash is None and error a message if the file could not be hashed.
+    """
+    try:
+        return file_path, calculate_file_hash(file_path, algorithm), None
+    except Exception as e:
+        # Caught per file, so one bad file can't abort the whole pool
+        return file_path, None, str(e)
+
+
+def hash_batch_worker(file_paths, algorithm):
+    """
+    Hash a batch of small files in a worker thread or process. Never touches the database.
+
+    :param file_paths: List of full paths to the files to hash.
+    :param algorithm: Name of the hash algorithm.
+    :return: List of (file path, hash, error) tuples, as returned by hash_only_worker.
+    """
+    try:
+        return [(file_path, file_hash, None) for file_path, file_hash in zip(file_paths, hash_batch(file_paths, algorithm))]
+    except Exception:
+        # Retry one by one so a single unreadable file doesn't fail the whole batch
+        return [hash_only_worker(file_path, algorithm) for file_path in file_paths]
+
+
+def hash_and_copy_worker(file_path, backup_path, algorithm):
+    """
+    Copy and hash a file in a single read pass in a worker thread or process. Never touches the database.
+
+    :param file_path: Full path to the file to back up.
+    :param backup_path: Full path to the backup file.
+    :param algorithm: Name of the hash algorithm.
+    :return: Tuple of (file path, hash, error); the hash is None and error a message if the copy failed.
+    """
+    try:
+        return file_path, hash_and_copy(file_path, backup_path, algorithm), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+class SourceContext:
+    def __init__(self, source_base_dir):
+        """
+        Paths shared by every file of one source, computed once so that per-file
+        paths are plain bytes slicing and concatenation.
+
+        Paths are kept as raw bytes, as os.scandir yields them for a bytes root,
+        so they are used as database keys without encoding and names that are
+        not valid UTF-8 round-trip. They are only decoded for display.
+
+        :param source_base_dir: Base directory of the source, already resolved (see os.path.realpath).
+        """
+        self.source_root = os.fsencode(source_base_dir)
+        assert self.source_root == os.path.realpath(self.source_root), \
+            f"{os.fsdecode(self.source_root)} is not a resolved path"
+        name = os.path.basename(self.source_root)
+        self.name = os.fsdecode(name)
+        # Each source gets its own place inside BACKUP_DIR, named after the source directory
+        self.backup_root = os.path.join(os.fsencode(config.BACKUP_DIR), name)
+        # Roots with a trailing separator, so that slicing them off leaves the relative path
+        self.source_prefix = os.path.join(self.source_root, b'')
+        self.backup_prefix = os.path.join(self.backup_root, b'')
+
+    def relative_path(self, file_path):
+        """Return the path (bytes) of a file inside the source, relative to its root."""
+        if not file_path.startswith(self.source_prefix):
+            raise ValueError(f"{os.fsdecode(file_path)} is not in the subpath of {os.fsdecode(self.source_root)}")
+        return file_path[len(self.source_prefix):]
+
+
 class BackupManager:
     def __init__(self, db_manager):
         self.db_manager = db_manager
-        self._setup_logging()
-
-    def _setup_logging(self):
-        """Set up logging to use the LOGS_DIR from config."""
-        logs_dir = Path(config.LOGS_DIR)
-        logs_dir.mkdir(parents=True, exist_ok=True)
-
-        logging.basicConfig(
-            filename=f"{logs_dir}/backup.log",
-            filemode="a",
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            level=logging.INFO  # Use INFO level to avoid verbose DEBUG logs unless necessary
-        )
+        # Backup directories already created during this run, to skip redundant mkdir calls
+        self._created_dirs = set()
+        # Source files and directories that could not be scanned; their backups are never deleted
+        self._scan_failures = set()
 
-    def backup_file(self, file_path, source_base_dir):
+    def backup_file(self, file_path, source_base_dir, st=None):
         """
         Backup a file if its checksum (hash) has changed since the last backup,
         or if the backup file is missing.
 
+        Files whose mtime, size and inode match the last backup are skipped
+        without being read.
+
         :param file_path: Full path to the file to be backed up.
-        :param source_base_dir: Base directory to calculate relative path for backup.
+        :param source_base_dir: Resolved base directory to calculate relative path for backup.
+        :param st: os.stat_result of the file if already known; otherwise it is stat'ed once here.
         """
         try:
-            file_path = Path(file_path).resolve()  # Resolve the absolute path
-            relative_path, backup_path = self._prepare_backup_paths(file_path, source_base_dir)
-
-            # Calculate file hash (checksum) once
-            file_hash = calculate_file_hash(file_path, config.HASH_ALGORITHM)
+            candidate = self._check_file(file_path, SourceContext(source_base_dir), st)
+            if candidate is None:
+                return
+            file_path, backup_path, st = candidate
 
-            # Only proceed if the file needs backing up (missing or modified)
-            if self._should_backup_file(file_path, backup_path, file_hash):
-                self._perform_backup(file_path, backup_path, file_hash)
+            # Same steps as backup_files, run inline instead of in a worker pool
+            if self._must_backup(file_path, backup_path):
+                _, file_hash, error = hash_and_copy_worker(file_path, backup_path, config.HASH_ALGORITHM)
+                self._finish_copied(file_path, backup_path, st, file_hash, error)
             else:
-                print(f"{Fore.YELLOW}Skipped {file_path}: no changes detected (checksum match).{Style.RESET_ALL}")
-                logging.info(f"Skipped {file_path}: no changes detected (checksum match).")
+                _, file_hash, error = hash_only_worker(file_path, config.HASH_ALGORITHM)
+                self._finish_hashed(file_path, backup_path, st, file_hash, error)
 
-        except FileNotFoundError:
-            self._log_error(f"Error: {file_path} not found.")
-        except PermissionError:
-            self._log_error(f"Error: Permission denied for {file_path}.")
         except Exception as e:
+            self._report_exception(file_path, e)
+
+    def backup_files(self, files, source_base_dir):
+        """
+        Backup many files that share the same source directory.
+
+        Files are filtered by metadata in this process, the remaining ones are
+        hashed (or, when a backup is needed anyway, hashed and copied in one
+        pass) in parallel workers, largest first. Each file's database row is
+        queued as soon as its result comes back.
+
+        Workers are threads when the hash algorithm releases the GIL, which
+        avoids starting processes and pickling every path and result; other
+        algorithms fall back to worker processes.
+
+        :param files: Iterable of (full path, stat_result) of the files to be backed up, as yielded by scan_directory.
+        :param source_base_dir: Resolved base directory to calculate relative path for backup.
+        :return: Set of the paths, relative to source_base_dir, of every file given (see remove_deleted_backups).
+        """
+        source = SourceContext(source_base_dir)
+        source_files = set()
+        candidates = []
+        scan_progress = tqdm(files, desc=f"Scanning {source.name}", unit="file", disable=config.VERBOSE)
+        for file_path, st in scan_progress:
+            try:
+                source_files.add(source.relative_path(file_path))
+                candidate = self._check_file(file_path, source, st)
+                if candidate is not None:
+                    candidates.append(candidate)
+            except Exception as e:
+                self._report_exception(file_path, e)
+
+        if not candidates:
+            return source_files
+
+        # Start the largest files first so they don't end up as the long tail
+        candidates.sort(key=lambda candidate: candidate[2].st_size, reverse=True)
+        # Keyed by path, which also drops files seen twice (a symlink resolved to another file of the source)
+        pending = {file_path: (backup_path, st) for file_path, backup_path, st in candidates}
+        # Bucket the files to hash by size: small ones are hashed in batches, large ones streamed
+        copy_paths, copy_backup_paths = [], []
+        small_paths, medium_paths, large_paths = [], [], []
+        for file_path, (backup_path, st) in list(pending.items()):
+            try:
+                must_backup = self._must_backup(file_path, backup_path)
+            except Exception as e:
+                self._report_exception(file_path, e)
+                del pending[file_path]
+                continue
+            if must_backup:
+                copy_paths.append(file_path)
+                copy_backup_paths.append(backup_path)
+            elif st.st_size < SMALL_FILE_SIZE:
+                small_paths.append(file_path)
+            elif st.st_size < MMAP_THRESHOLD:
+                medium_paths.append(file_path)
+            else:
+                large_paths.append(file_path)
+        batches = [bucket[i:i + HASH_BATCH_SIZE]
+                   for bucket in (medium_paths, small_paths)
+                   for i in range(0, len(bucket), HASH_BATCH_SIZE)]
+
+        algorithm = config.HASH_ALGORITHM
+        if algorithm in GIL_RELEASING_ALGORITHMS:
+            executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        else:
+            executor = ProcessPoolExecutor()
+        with executor, \
+                tqdm(total=len(pending), desc=f"Backing up {source.name}", unit="file",
+                     disable=config.VERBOSE) as progress:
+            copied = executor.map(hash_and_copy_worker, copy_paths, copy_backup_paths, repeat(algorithm))
+            hashed = executor.map(hash_only_worker, large_paths, repeat(algorithm))
+            batch_hashed = executor.map(hash_batch_worker, batches, repeat(algorithm))
+
+            for file_path, file_hash, error in copied:
+                try:
+                    self._finish_copied(file_path, *pending[file_path], file_hash, error)
+                except Exception as e:
+                    self._report_exception(file_path, e)
+                progress.update()
+
+            for file_path, file_hash, error in chain(hashed, chain.from_iterable(batch_hashed)):
+                try:
+                    self._finish_hashed(file_path, *pending[file_path], file_hash, error)
+                except Exception as e:
+                    self._report_exception(file_path, e)
+                progress.update()
+
+        return source_files
+
+    def _check_file(self, file_path, source, st=None):
+        """
+        Resolve the backup location of a file and check whether it may have changed.
+
+        :param file_path: Full path to the file to be backed up.
+        :param source: SourceContext of the source the file belongs to.
+        :param st: stat_result of the file if already known (e.g. from scan_directory).
+        :return: Tuple of (file_path, backup_path, stat_result) with bytes paths, or None if the file is unchanged.
+        """
+        # Paths under a resolved source are already canonical except for symlinked files;
+        # with --follow-symlinks those are resolved to their target, which must be inside the source
+        file_path = os.fsencode(file_path)
+        if config.FOLLOW_SYMLINKS:
+            resolved_path = os.path.realpath(file_path)
+            if not resolved_path.startswith(source.source_prefix):
+                raise ValueError(f"{os.fsdecode(file_path)} links to {os.fsdecode(resolved_path)}, "
+                                 f"outside of {os.fsdecode(source.source_root)}")
+            file_path = resolved_path
+        relative_path, backup_path = self._prepare_backup_paths(file_path, source)
+
+        # Cheap metadata check first; only hash if something may have changed
+        if st is None:
+            st = os.stat(file_path)
+        if self._is_unchanged(file_path, backup_path, st):
+            self._log(logging.INFO, Fore.YELLOW, "Skipped %s: no changes detected (metadata match).", file_path)
+            return None
+
+        return file_path, backup_path, st
+
+    def _finish_copied(self, file_path, backup_path, st, file_hash, error):
+        """
+        Record a file that was hashed and copied in a single pass.
+
+        :param file_path: Full path to the source file.
+        :param backup_path: Full path to the backup file.
+        :param st: stat_result of the source file taken before copying.
+        :param file_hash: Hash of the copied file, or None if the copy failed.
+        :param error: Error message if the copy failed.
+        """
+        if file_hash is None:
+            self._log_error(f"Failed to backup {os.fsdecode(file_path)} to {os.fsdecode(backup_path)}: {error}")
+            return
+
+        self._log_backed_up(file_path, backup_path)
+        self._update_db(file_path, file_hash, st)
+
+    def _finish_hashed(self, file_path, backup_path, st, file_hash, error):
+        """
+        Copy a hashed file if its checksum changed, then record it.
+
+        :param file_path: Full path to the source file.
+        :param backup_path: Full path to the backup file.
+        :param st: stat_result of the source file taken before hashing.
+        :param file_hash: Hash of the source file, or None if it could not be read.
+        :param error: Error message if the file could not be read.
+        """
+        if file_hash is None:
+            self._log_error(f"Error: could not read {os.fsdecode(file_path)}: {error}")
+            return
+
+        # Only proceed if the file needs backing up (modified)
+        if self._should_backup_file(file_path, backup_path, file_hash):
+            if not self._perform_backup(file_path, backup_path):
+                return
+        else:
+            self._log(logging.INFO, Fore.YELLOW, "Skipped %s: no changes detected (checksum match).", file_path)
+
+        # Stored even on a checksum match so the next run can skip on metadata alone
+        self._update_db(file_path, file_hash, st)
+
+    def _update_db(self, file_path, file_hash, st):
+        """Update the database with file metadata (from a stat_result) and hash."""
+        self.db_manager.update_file_data(
+            file_path, file_hash, st.st_mtime, st.st_size, config.HASH_ALGORITHM, st.st_ino)
+
+    def _report_exception(self, file_path, e):
+        """Log an exception raised while backing up a file."""
+        if isinstance(e, FileNotFoundError):
+            self._log_error(f"Error: {os.fsdecode(file_path)} not found.")
+        elif isinstance(e, PermissionError):
+            self._log_error(f"Error: Permission denied for {os.fsdecode(file_path)}.")
+        else:
             self._log_error(f"Unexpected error: {str(e)}")
 
-    def _prepare_backup_paths(self, file_path, source_base_dir):
+    def _prepare_backup_paths(self, file_path, source):
         """
         Prepare the relative and backup paths for a file.
 
-        :param file_path: Full path of the source file.
-        :param source_base_dir: Base directory of the source.
-        :return: Tuple containing the relative path and backup path.
+        :param file_path: Full path of the source file, as bytes.
+        :param source: SourceContext of the source the file belongs to.
+        :return: Tuple containing the relative path and backup path, as bytes.
         """
-        # Ensure each source has its own backup directory by adding the source_base_dir name
-        source_name = source_base_dir.name
-
         # Calculate the relative path of the file within its source directory
-        relative_path = file_path.relative_to(source_base_dir)
+        relative_path = source.relative_path(file_path)
 
-        # Construct the backup path so each source gets its own place inside BACKUP_DIR
-        backup_path = Path(config.BACKUP_DIR) / source_name / relative_path
+        # Construct the backup path inside the source's own backup directory
+        backup_path = source.backup_prefix + relative_path
 
         # Ensure that the parent directory of the backup file exists
-        backup_path.parent.mkdir(parents=True, exist_ok=True)
+        backup_dir = os.path.dirname(backup_path)
+        if backup_dir not in self._created_dirs:
+            os.makedirs(backup_dir, exist_ok=True)
+            self._created_dirs.add(backup_dir)
 
         return relative_path, backup_path
 
+    def _is_unchanged(self, file_path, backup_path, st):
+        """
+        Determine if the file is unchanged since the last backup based on metadata alone.
+
+        :param file_path: Full path to the source file.
+        :param backup_path: Full path to the backup file.
+        :param st: stat_result of the source file.
+        :return: Boolean indicating whether mtime, size and inode match and the backup exists.
+        """
+        stored_mod_time, stored_size, stored_inode = self.db_manager.get_file_metadata(file_path)
+        if (st.st_mtime, st.st_size, st.st_ino) != (stored_mod_time, stored_size, stored_inode):
+            return False
+
+        return self._backup_exists(backup_path)
+
+    @staticmethod
+    def _backup_exists(backup_path):
+        """Check for the backup file with a single stat call."""
+        try:
+            os.stat(backup_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _must_backup(self, file_path, backup_path):
+        """
+        Determine if the file needs backing up before it is even hashed
+        (missing backup, or no comparable hash stored).
+
+        :param file_path: Full path to the source file.
+        :param backup_path: Full path to the backup file.
+        :return: Boolean indicating whether to back up the file regardless of its hash.
+        """
+        if not self._backup_exists(backup_path):
+            self._log(logging.INFO, Fore.GREEN, "Backing up %s: backup file missing.", file_path)
+            return True
+
+        return self.db_manager.get_file_hash(file_path, config.HASH_ALGORITHM) is None
+
     def _should_backup_file(self, file_path, backup_path, file_hash):
         """
-        Determine if the file should be backed up (checksum mismatch or missing backup).
+        Determine if the file should be backed up (checksum mismatch).
+
+        Only called once _must_backup has ruled out a missing backup, so the
+        backup file is not stat'ed again here.
 
         :param file_path: Full path to the source file.
         :param backup_path: Full path to the backup file.
         :param file_hash: Hash of the source file.
         :return: Boolean indicating whether to back up the file.
         """
-        # If backup file is missing, return True (needs backup)
-        if not backup_path.exists():
-            print(f"{Fore.GREEN}Backing up {file_path}: backup file missing.{Style.RESET_ALL}")
-            logging.info(f"Backing up {file_path}: backup file missing.")
-            return True
-
         # Compare the file hash with the stored hash from the database
-        stored_hash = self.db_manager.get_file_hash(file_path)
+        stored_hash = self.db_manager.get_file_hash(file_path, config.HASH_ALGORITHM)
         if file_hash != stored_hash:
             return True
 
         # No backup needed if file is unchanged
         return False
 
-    def _perform_backup(self, file_path, backup_path, file_hash):
+    def _perform_backup(self, file_path, backup_path):
         """
-        Perform the backup by copying the file and updating the database.
+        Perform the backup of an already hashed file by copying it.
 
         :param file_path: Full path to the source file.
         :param backup_path: Full path to the destination (backup) file.
-        :param file_hash: Hash of the source file.
+        :return: Boolean indicating whether the backup succeeded.
         """
         try:
             self._copy_file(file_path, backup_path)
-            self._update_db(file_path, file_hash)
-            print(f"{Fore.GREEN}Backed up {file_path} to {backup_path}{Style.RESET_ALL}")
-            logging.info(f"Backed up {file_path} to {backup_path}")
+            self._log_backed_up(file_path, backup_path)
+            return True
         except Exception as e:
-            self._log_error(f"Failed to backup {file_path} to {backup_path}: {str(e)}")
+            self._log_error(f"Failed to backup {os.fsdecode(file_path)} to {os.fsdecode(backup_path)}: {str(e)}")
+            return False
 
-    def _update_db(self, file_path, file_hash):
-        """Update the database with file metadata and hash."""
-        mod_time = os.path.getmtime(file_path)
-        file_size = os.path.getsize(file_path)
-        self.db_manager.update_file_data(file_path, file_hash, mod_time, file_size)
+    def _log_backed_up(self, file_path, backup_path):
+        """Helper to log a successful backup and display it in green."""
+        self._log(logging.INFO, Fore.GREEN, "Backed up %s to %s", file_path, backup_path)
 
     def _copy_file(self, source, destination):
-        """Handles file copying with error logging."""
+        """
+        Copy a file and its metadata, like shutil.copy2, using the kernel's zero-copy paths.
+
+        Tries copy_file_range first, then sendfile, then a regular shutil.copyfile.
+        Errors are left to the caller, which decides whether the backup failed.
+        """
+        self._log(logging.DEBUG, Fore.BLUE, "Copying %s to %s", source, destination)
+
+        in_fd = os.open(source, os.O_RDONLY)
         try:
-            shutil.copy2(source, destination)
-            print(f"{Fore.BLUE}Copying {source} to {destination}{Style.RESET_ALL}")
-            logging.debug(f"Copying {source} to {destination}")
-        except Exception as e:
-            self._log_error(f"Failed to copy {source} to {destination}: {str(e)}")
+            out_fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                copied = self._copy_fd(in_fd, out_fd)
+            finally:
+                os.close(out_fd)
+        finally:
+            os.close(in_fd)
+
+        if not copied:
+            shutil.copyfile(source, destination)
+        shutil.copystat(source, destination)
+
+    @staticmethod
+    def _copy_fd(in_fd, out_fd):
+        """
+        Copy the remaining contents of in_fd to out_fd inside the kernel.
+
+        Both file offsets advance together, so falling back from copy_file_range
+        to sendfile part way through still produces a complete copy.
+
+        :return: Boolean indicating whether the copy completed; False means the caller should fall back.
+        """
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while os.copy_file_range(in_fd, out_fd, ZERO_COPY_CHUNK):
+                    pass
+                return True
+            except OSError as e:
+                if e.errno not in ZERO_COPY_FALLBACK_ERRNOS:
+                    raise
+
+        try:
+            while os.sendfile(out_fd, in_fd, None, ZERO_COPY_CHUNK):
+                pass
+            return True
+        except OSError as e:
+            if e.errno not in ZERO_COPY_FALLBACK_ERRNOS:
+                raise
+        return False
+
+    def _log(self, level, color, msg, *args):
+        """
+        Helper to log a message and, in verbose mode, display it in color.
+
+        The message is only formatted if it is actually displayed or logged;
+        bytes paths among the arguments are decoded only then.
+        """
+        if not (config.VERBOSE or logger.isEnabledFor(level)):
+            return
+        args = tuple(os.fsdecode(arg) if isinstance(arg, bytes) else arg for arg in args)
+        if config.VERBOSE:
+            tqdm.write(f"{color}{msg % args}{Style.RESET_ALL}")
+        logger.log(level, msg, *args)
 
     def _log_error(self, message):
-        """Helper to log errors and display them in red."""
-        print(f"{Fore.RED}{message}{Style.RESET_ALL}")
-        logging.error(message)
+        """Helper to log errors and display them in red (even when not verbose)."""
+        tqdm.write(f"{Fore.RED}{message}{Style.RESET_ALL}")
+        logger.error(message)
 
-    def remove_deleted_backups(self, source_base_dir):
+    def report_scan_error(self, error):
+        """
+        Report a source file or directory that could not be scanned (onerror for scan_directory).
+
+        Its path is remembered so that remove_deleted_backups keeps the backups under it.
+
+        :param error: OSError raised while scanning; its filename is the path that failed.
+        """
+        self._scan_failures.add(error.filename)
+        self._log_error(f"Error: could not scan {os.fsdecode(error.filename)}: {error.strerror}")
+
+    def remove_deleted_backups(self, source_base_dir, source_files):
         """
         Remove backup files that no longer exist in the source directory.
 
-        :param source_base_dir: The base directory of the source to scan.
+        Backups under a source path that could not be scanned (see report_scan_error)
+        are kept, since its files are missing from source_files only because they were not seen.
+
+        :param source_base_dir: The base directory of the source that was scanned.
+        :param source_files: Set of the paths, relative to source_base_dir, of the files found in the source.
         """
-        backup_dir = Path(config.BACKUP_DIR) / source_base_dir.name
-        for backup_file in backup_dir.rglob('*'):
-            relative_path = backup_file.relative_to(Path(config.BACKUP_DIR) / source_base_dir.name)
-            source_file = source_base_dir / relative_path
+        source = SourceContext(source_base_dir)
+        if source.source_root in self._scan_failures:
+            return
+        if not os.path.isdir(source.backup_root):
+            return  # Nothing was backed up from this source yet (e.g. it is empty)
+        failed = {source.relative_path(path) for path in self._scan_failures if path.startswith(source.source_prefix)}
+        failed_prefixes = tuple(os.path.join(path, b'') for path in failed)
+
+        def report_error(error):
+            self._log_error(f"Error: could not scan {os.fsdecode(error.filename)}: {error.strerror}")
 
-            if not source_file.exists():
-                self._delete_file(backup_file)
+        for entry in scan_entries(source.backup_root, onerror=report_error):
+            relative_path = entry.path[len(source.backup_prefix):]
+            if relative_path in source_files or relative_path in failed or relative_path.startswith(failed_prefixes):
+                continue
+            self._delete_file(entry.path)
 
     def _delete_file(self, file_path):
         """Handles file deletion with error logging."""
         try:
-            file_path.unlink()
-            print(f"{Fore.RED}Deleted {file_path}{Style.RESET_ALL}")
-            logging.debug(f"Deleted {file_path}")
+            os.unlink(file_path)
+            self._log(logging.INFO, Fore.RED, "Deleted %s", file_path)
         except Exception as e:
-            self._log_error(f"Failed to delete {file_path}: {str(e)}")
\ No newline at end of file
+            self._log_error(f"Failed to delete {os.fsdecode(file_path)}: {str(e)}")
\ No newline at end of file
@@ -5,4 +5,6 @@ BACKUP_DIR = f'{BASE_DIR}/BackUp/'
 DATABASE_DIR = f'{BASE_DIR}/.db/'
 LOGS_DIR = f'{BASE_DIR}/.logs/'
 MAX_BACKUPS = 5
-HASH_ALGORITHM = 'md5'  # Can be 'sha256', 'md5', etc
\ No newline at end of file
+HASH_ALGORITHM = 'blake3'  # Can be 'blake3', 'blake2b', 'sha256', 'md5', etc
+VERBOSE = False  # Print a line per file instead of a progress bar (set by -v/--verbose)
+FOLLOW_SYMLINKS = False  # Back up symlinked files under their target's path, if inside the source (set by --follow-symlinks)
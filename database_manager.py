@@ -1,7 +1,20 @@
 # database_manager.py
 
+import logging
+import os
+import queue
 import sqlite3
+import threading
+import time
 from pathlib import Path
+import blake3
+
+logger = logging.getLogger(__name__)
+
+def hash_path(file_path):
+    """Return the fixed-width (16 byte) key used to identify a file path in the database."""
+    return blake3.blake3(os.fsencode(file_path)).digest()[:16]
+
 
 class DatabaseManager:
     def __init__(self, backup_dir, backup_file='database.db'):
@@ -18,13 +31,21 @@ class DatabaseManager:
         self.backup_dir.mkdir(parents=True, exist_ok=True)
 
         # Connect to in-memory SQLite database
-        self.conn = sqlite3.connect(':memory:')
+        # (shared with the AsyncDatabaseWriter thread, which owns it while running)
+        self.conn = sqlite3.connect(':memory:', check_same_thread=False)
         self.enable_wal()
+        self.tune_pragmas()
         self.create_tables()
 
         # Load data from disk if backup exists
         if self.backup_file.exists():
             self.load_from_disk()
+            self.migrate_tables()
+
+        # Lookups are served from memory; writes are queued and flushed in bulk
+        self._index = self.load_index()
+        self.pending_updates = []
+        self.writer = None
 
     def enable_wal(self):
         """Enable Write-Ahead Logging (WAL) for better concurrency when backing up to disk."""
@@ -32,43 +53,150 @@ class DatabaseManager:
             self.conn.execute("PRAGMA journal_mode=WAL;")
         print("WAL mode enabled for SQLite in-memory database.")
 
+    def tune_pragmas(self):
+        """
+        Keep temporary tables and indices (e.g. from the table rebuild in migrate_tables) in memory.
+
+        Other I/O pragmas (synchronous, cache_size, mmap_size) have no effect on an
+        in-memory database, and the on-disk connections only copy pages with backup(),
+        where relaxing synchronous would just weaken the durability of the saved file.
+        """
+        with self.conn:
+            self.conn.execute("PRAGMA temp_store=MEMORY;")
+
     def create_tables(self):
         """Create necessary tables in the in-memory SQLite database."""
         with self.conn:
             self.conn.execute("""
             CREATE TABLE IF NOT EXISTS file_hashes (
-                file_path TEXT PRIMARY KEY,
+                path_hash BLOB PRIMARY KEY,
+                file_path BLOB,
                 hash_code TEXT,
                 last_backup DATETIME,
                 mod_time REAL,
-                file_size INTEGER
-            )
+                file_size INTEGER,
+                algo TEXT,
+                inode INTEGER
+            ) WITHOUT ROWID
             """)
 
-    def update_file_data(self, file_path, hash_code, mod_time, file_size):
-        """Update file data in the in-memory SQLite database."""
-        file_path_str = str(file_path) if isinstance(file_path, Path) else file_path
+    def migrate_tables(self):
+        """Bring a database loaded from disk up to the current schema."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(file_hashes)")}
         with self.conn:
-            self.conn.execute("""
-            INSERT OR REPLACE INTO file_hashes (file_path, hash_code, mod_time, file_size, last_backup)
-            VALUES (?, ?, ?, ?, datetime('now'))
-            """, (file_path_str, hash_code, mod_time, file_size))
-
-    def get_file_hash(self, file_path):
-        """Retrieve the hash code of a file from the in-memory SQLite database."""
-        file_path_str = str(file_path) if isinstance(file_path, Path) else file_path
-        cur = self.conn.cursor()
-        cur.execute("SELECT hash_code FROM file_hashes WHERE file_path = ?", (file_path_str,))
-        row = cur.fetchone()
-        return row[0] if row else None
+            if 'algo' not in columns:
+                # Rows written before the column existed have an unknown algorithm (NULL)
+                self.conn.execute("ALTER TABLE file_hashes ADD COLUMN algo TEXT")
+            if 'inode' not in columns:
+                self.conn.execute("ALTER TABLE file_hashes ADD COLUMN inode INTEGER")
+
+        if 'path_hash' not in columns:
+            # Rebuild the table keyed by the path hash with a clustered (WITHOUT ROWID) layout
+            self.conn.create_function('hash_path', 1, hash_path, deterministic=True)
+            with self.conn:
+                self.conn.execute("ALTER TABLE file_hashes RENAME TO file_hashes_old")
+            self.create_tables()
+            with self.conn:
+                self.conn.execute("""
+                INSERT INTO file_hashes (path_hash, file_path, hash_code, last_backup, mod_time, file_size, algo, inode)
+                SELECT hash_path(file_path), file_path, hash_code, last_backup, mod_time, file_size, algo, inode
+                FROM file_hashes_old
+                """)
+                self.conn.execute("DROP TABLE file_hashes_old")
+
+    def load_index(self):
+        """
+        Load every file_hashes row into a dictionary with a single query.
+
+        Keys are the raw (bytes) file paths, so names that are not valid UTF-8
+        round-trip; rows written as TEXT by older versions are encoded on load.
+
+        :return: Dict mapping file_path (bytes) to (hash_code, mod_time, file_size, algo, inode).
+        """
+        cur = self.conn.execute("SELECT file_path, hash_code, mod_time, file_size, algo, inode FROM file_hashes")
+        return {os.fsencode(row[0]): row[1:] for row in cur}
+
+    def update_file_data(self, file_path, hash_code, mod_time, file_size, algo, inode):
+        """
+        Update file data in the index and queue it for the in-memory SQLite database.
+
+        Rows go to the background writer if one is running (and has not failed),
+        otherwise they are kept until flush().
+
+        :param file_path: Full path of the file, as bytes (see load_index).
+        """
+        self._index[file_path] = (hash_code, mod_time, file_size, algo, inode)
+        row = (file_path, hash_code, mod_time, file_size, algo, inode)
+        if self.writer is not None and self.writer.error is None:
+            self.writer.put(row)
+        else:
+            self.pending_updates.append(row)
+
+    def start_writer(self):
+        """Start an AsyncDatabaseWriter so updates are written while the backup is still running."""
+        if self.writer is None:
+            self.writer = AsyncDatabaseWriter(self)
+
+    def flush(self):
+        """
+        Stop the background writer, if any, and write all queued updates in a single transaction.
+
+        Rows the writer could not write (because it failed) are retried here.
+        If that fails too, the error is raised and those rows are dropped.
+        """
+        if self.writer is not None:
+            writer, self.writer = self.writer, None
+            self.pending_updates = writer.close() + self.pending_updates
+        if not self.pending_updates:
+            return
+        rows, self.pending_updates = self.pending_updates, []
+        self.write_rows(rows)
+
+    def _flush_or_report(self):
+        """Flush queued updates, reporting instead of raising if they cannot be written."""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error("Could not write queued file data to the database: %s", e)
+            print(f"Error: could not write queued file data to the database: {e}")
+
+    def write_rows(self, rows):
+        """
+        Upsert rows into the in-memory SQLite database in a single transaction.
+
+        :param rows: Iterable of (file_path, hash_code, mod_time, file_size, algo, inode) tuples.
+        """
+        rows = [(hash_path(row[0]),) + row for row in rows]
+        with self.conn:
+            self.conn.executemany("""
+            INSERT INTO file_hashes (path_hash, file_path, hash_code, mod_time, file_size, algo, inode, last_backup)
+            VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
+            ON CONFLICT(path_hash) DO UPDATE SET
+                file_path = excluded.file_path,
+                hash_code = excluded.hash_code,
+                mod_time = excluded.mod_time,
+                file_size = excluded.file_size,
+                algo = excluded.algo,
+                inode = excluded.inode,
+                last_backup = excluded.last_backup
+            """, rows)
+
+    def get_file_hash(self, file_path, algo):
+        """
+        Retrieve the hash code of a file from the index.
+
+        Returns None if the stored hash was computed with a different algorithm,
+        since digests from different algorithms can never be compared.
+
+        :param file_path: Full path of the file, as bytes.
+        """
+        entry = self._index.get(file_path)
+        return entry[0] if entry and entry[3] == algo else None
 
     def get_file_metadata(self, file_path):
-        """Retrieve file metadata (mod_time, file_size) from the in-memory SQLite database."""
-        file_path_str = str(file_path) if isinstance(file_path, Path) else file_path
-        cur = self.conn.cursor()
-        cur.execute("SELECT mod_time, file_size FROM file_hashes WHERE file_path = ?", (file_path_str,))
-        row = cur.fetchone()
-        return row if row else (None, None)
+        """Retrieve file metadata (mod_time, file_size, inode) of a file path (bytes) from the index."""
+        entry = self._index.get(file_path)
+        return (entry[1], entry[2], entry[4]) if entry else (None, None, None)
 
     def load_from_disk(self):
         """Load the SQLite database from a file on disk into the in-memory database."""
@@ -77,7 +205,13 @@ class DatabaseManager:
         print(f"Loaded database from {self.backup_file}")
 
     def backup_to_disk(self):
-        """Backup the in-memory database to a file on disk."""
+        """
+        Backup the in-memory database to a file on disk.
+
+        Rows that could not be written are reported, and everything already
+        in the database is still saved.
+        """
+        self._flush_or_report()
         with sqlite3.connect(self.backup_file) as disk_conn:
             self.conn.backup(disk_conn)
         print(f"Backed up database to {self.backup_file}")
@@ -85,5 +219,76 @@ class DatabaseManager:
     def close(self):
         """Close the database connection."""
         if self.conn:
+            self._flush_or_report()
             self.conn.close()
-            print("Database connection closed.")
\ No newline at end of file
+            print("Database connection closed.")
+
+
+class AsyncDatabaseWriter:
+    BATCH_SIZE = 1000
+    FLUSH_INTERVAL = 0.2  # Seconds to wait for more rows before writing a partial batch
+
+    def __init__(self, db_manager):
+        """
+        Write file_hashes rows from a background thread, so callers never wait on SQLite.
+
+        :param db_manager: DatabaseManager whose connection the writer uses until it is closed.
+        """
+        self.db_manager = db_manager
+        self.q = queue.Queue()
+        self.error = None  # Set if a write failed; the thread then stops and put() must not be used
+        self.failed_rows = []
+        self._sentinel = object()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, row):
+        """Queue a (file_path, hash_code, mod_time, file_size, algo, inode) row for writing."""
+        self.q.put(row)
+
+    def _run(self):
+        """Drain the queue in batches of up to BATCH_SIZE rows or FLUSH_INTERVAL seconds."""
+        stopping = False
+        while not stopping:
+            item = self.q.get()
+            if item is self._sentinel:
+                break
+
+            items = [item]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(items) < self.BATCH_SIZE:
+                try:
+                    item = self.q.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is self._sentinel:
+                    stopping = True
+                    break
+                items.append(item)
+
+            try:
+                self.db_manager.write_rows(items)
+            except Exception as e:
+                logger.error("Background database writer failed, queueing rows for flush(): %s", e)
+                print(f"Error: background database writer failed: {e}")
+                self.failed_rows = items
+                self.error = e
+                return
+
+    def close(self):
+        """
+        Write any remaining rows and stop the thread.
+
+        :return: List of the rows that were not written because the writer failed (empty otherwise).
+        """
+        self.q.put(self._sentinel)
+        self._thread.join()
+        rows = self.failed_rows
+        while True:
+            try:
+                item = self.q.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._sentinel:
+                rows.append(item)
+        return rows
@@ -1,18 +1,160 @@
 # file_scanner.py
 
+import errno
 import hashlib
-from pathlib import Path
+import mmap
+import os
+import shutil
+import threading
+from functools import lru_cache
+import blake3
+
+CHUNK_SIZE = 1 << 20  # 1 MiB, large enough to amortize per-call overhead in the hash core
+MMAP_THRESHOLD = 1 << 20  # Smaller files are cheaper to read into a buffer than to map
+SMALL_FILE_SIZE = 64 << 10  # Files below this size are hashed in batches
+
+
+@lru_cache(maxsize=8)
+def _hash_template(algorithm):
+    """
+    Returns an empty hash object to copy() from, created only once per algorithm.
+
+    Copying the initial state is cheaper than looking up the constructor and
+    initializing a new context for every file. The cache is per process, so
+    each worker process builds its own.
+    """
+    if algorithm == 'blake3':
+        return blake3.blake3()
+    return getattr(hashlib, algorithm)()
+
+
+_local = threading.local()
+
+
+def _chunk_buffer():
+    """
+    Returns this thread's reusable CHUNK_SIZE read buffer (as a memoryview).
+
+    Allocating (and zeroing) a fresh 1 MiB buffer per file costs more than
+    hashing and copying a small file, so each thread keeps one for its lifetime.
+    """
+    mv = getattr(_local, 'buffer', None)
+    if mv is None:
+        mv = _local.buffer = memoryview(bytearray(CHUNK_SIZE))
+    return mv
 
 
 def calculate_file_hash(file_path, algorithm='sha256'):
     """Calculates the hash of a file."""
-    hash_func = getattr(hashlib, algorithm)()
+    if algorithm == 'blake3':
+        # Memory-mapped, multithreaded SIMD hashing in the Rust implementation
+        hash_func = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        hash_func.update_mmap(os.fsdecode(file_path))  # Only accepts str paths
+        return hash_func.hexdigest()
+
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_func.update(chunk)
+        if hasattr(hashlib, 'file_digest'):
+            # Python 3.11+: the read/update loop runs in C with a reused buffer
+            return hashlib.file_digest(f, _hash_template(algorithm).copy).hexdigest()
+
+        hash_func = _hash_template(algorithm).copy()
+        mv = _chunk_buffer()
+        while n := f.readinto(mv):
+            hash_func.update(mv[:n])
+    return hash_func.hexdigest()
+
+
+def hash_batch(paths, algorithm='sha256'):
+    """
+    Calculates the hashes of many small files.
+
+    Each file is read with a single call and hashed in one update on a
+    single thread, avoiding the per-file mmap and thread pool setup that
+    only pays off for large files.
+    """
+    template = _hash_template(algorithm)
+    hashes = []
+    for path in paths:
+        hash_func = template.copy()
+        with open(path, "rb") as f:
+            hash_func.update(f.read())
+        hashes.append(hash_func.hexdigest())
+    return hashes
+
+
+def hash_and_copy(src, dst, algorithm='sha256'):
+    """
+    Copies a file (with its metadata) and returns its hash, reading the source only once.
+
+    Every chunk read from the source is fed to the hasher and written to the
+    destination, so the returned hash is exactly that of the copied bytes.
+    """
+    if algorithm == 'blake3':
+        hash_func = blake3.blake3(max_threads=blake3.blake3.AUTO)
+    else:
+        hash_func = _hash_template(algorithm).copy()
+
+    with open(src, "rb", buffering=0) as f, open(dst, "wb") as out:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as mv:
+                for offset in range(0, len(mm), CHUNK_SIZE):
+                    with mv[offset:offset + CHUNK_SIZE] as chunk:
+                        hash_func.update(chunk)
+                        out.write(chunk)
+        else:
+            mv = _chunk_buffer()
+            while n := f.readinto(mv):
+                hash_func.update(mv[:n])
+                out.write(mv[:n])
+
+    shutil.copystat(src, dst)
     return hash_func.hexdigest()
 
 
-def scan_directory(directory_path):
-    """Scans a directory and returns a list of file paths."""
-    return [str(path) for path in Path(directory_path).rglob('*') if path.is_file()]
\ No newline at end of file
+def scan_entries(directory_path, onerror=None):
+    """
+    Scans a directory recursively and yields the os.DirEntry of everything that is not a directory.
+
+    Directory symlinks are not followed. Directories that cannot be read are
+    skipped; like os.walk, the OSError is passed to onerror, if given.
+    """
+    stack = [os.fspath(directory_path)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        yield entry
+        except OSError as e:
+            if onerror is not None:
+                onerror(e)
+
+
+def scan_directory(directory_path, onerror=None):
+    """
+    Scans a directory recursively and yields (file path, stat_result) for every regular file.
+
+    Uses os.scandir so file types come from the cached directory entries.
+    Symlinks to files are followed (and stat'ed through), symlinks to
+    directories are not. Files removed while scanning, dangling symlinks and
+    symlink loops are skipped; any other OSError, including one for an
+    unreadable directory, is passed to onerror.
+    """
+    for entry in scan_entries(directory_path, onerror):
+        try:
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+        except FileNotFoundError:
+            continue  # Removed (or a dangling symlink) since the directory was read
+        except OSError as e:
+            if e.errno == errno.ELOOP:
+                continue  # A symlink loop points at no file, like a dangling symlink
+            if onerror is not None:
+                onerror(e)
+            continue
+        yield entry.path, st
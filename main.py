@@ -5,26 +5,53 @@ from database_manager import DatabaseManager
 from backup_manager import BackupManager
 from file_scanner import scan_directory
 import config
+import logging
 import os
+import stat
+
+VERBOSE_FLAGS = ('-v', '--verbose')
+FOLLOW_SYMLINKS_FLAGS = ('--follow-symlinks',)
+
+def _configure_logging():
+    """Set up logging to use the LOGS_DIR from config. Called once per run."""
+    logs_dir = Path(config.LOGS_DIR)
+    logs_dir.mkdir(parents=True, exist_ok=True)
+
+    logging.basicConfig(
+        filename=f"{logs_dir}/backup.log",
+        filemode="a",
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        level=logging.INFO  # Use INFO level to avoid verbose DEBUG logs unless necessary
+    )
 
 def initialize():
-    """Ensure that all necessary directories exist before running the backup."""
+    """Ensure that all necessary directories exist and logging is set up before running the backup."""
     app_dirs = [Path(x) for x in [config.BASE_DIR, config.BACKUP_DIR, config.LOGS_DIR, config.DATABASE_DIR]]
     for directory in app_dirs:
         if not directory.exists():
             directory.mkdir(parents=True, exist_ok=True)
             print(f'Created directory: {directory}')
+    _configure_logging()
 
 def main():
     initialize()
 
+    # Per-file output is only printed with -v/--verbose; otherwise a progress bar is shown
+    args = [arg for arg in os.sys.argv[1:] if arg not in VERBOSE_FLAGS]
+    config.VERBOSE = len(args) != len(os.sys.argv[1:])
+    # File paths are only resolved one by one with --follow-symlinks; sources are always resolved once below
+    paths = [arg for arg in args if arg not in FOLLOW_SYMLINKS_FLAGS]
+    config.FOLLOW_SYMLINKS = len(paths) != len(args)
+    args = paths
+
     # Initialize the DatabaseManager with in-memory database and backup/reload mechanism using DATABASE_DIR
     db_manager = DatabaseManager(config.DATABASE_DIR)
+    db_manager.start_writer()
     backup_manager = BackupManager(db_manager)
 
     # List of files and directories to back up
-    if len(os.sys.argv) > 1:
-        paths_to_backup = os.sys.argv[1:]
+    if args:
+        paths_to_backup = args
     else:
         paths_to_backup = [
             '/home/ono/Projects/gitting_the_git',
@@ -34,21 +61,25 @@ def main():
 
     # Process each path for backup
     for path in paths_to_backup:
-        source_path = Path(path).resolve()
+        # Sources are scanned with a bytes root so every path comes back as raw bytes
+        source_path = os.fsencode(os.path.realpath(path))
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            st = None
 
-        if source_path.is_file():
+        if st is not None and stat.S_ISREG(st.st_mode):
             # Backup single file
-            backup_manager.backup_file(source_path, source_path.parent)
-        elif source_path.is_dir():
+            backup_manager.backup_file(source_path, os.path.dirname(source_path), st)
+        elif st is not None and stat.S_ISDIR(st.st_mode):
             # Backup all files in the directory
-            files_to_backup = scan_directory(source_path)
-            for file_path in files_to_backup:
-                backup_manager.backup_file(file_path, source_path)
+            files_to_backup = scan_directory(source_path, onerror=backup_manager.report_scan_error)
+            source_files = backup_manager.backup_files(files_to_backup, source_path)
 
             # After backing up, remove files that were deleted in the source
-            backup_manager.remove_deleted_backups(source_path)
+            backup_manager.remove_deleted_backups(source_path, source_files)
         else:
-            print(f"Warning: {source_path} is not a valid file or directory.")
+            print(f"Warning: {os.fsdecode(source_path)} is not a valid file or directory.")
 
     # Backup the in-memory database to disk before exiting
     db_manager.backup_to_disk()